@@ -1,6 +1,7 @@
 import os
 import click
 import logging
+from odoo import registry, api, SUPERUSER_ID
 from odoo.cli.command import Command
 
 _logger = logging.getLogger(__name__)
@@ -25,9 +26,8 @@ class ConfigCommand(Command):
         logging.basicConfig(level=getattr(logging, log_level.upper()))
         
         try:
-            from odoo import registry, api, SUPERUSER_ID
             from ..models.config_factory import create_config_factory
-            
+
             # Ensure output directory exists
             os.makedirs(output, exist_ok=True)
             
@@ -63,9 +63,8 @@ class ConfigCommand(Command):
         logging.basicConfig(level=getattr(logging, log_level.upper()))
         
         try:
-            from odoo import registry, api, SUPERUSER_ID
             from ..models.config_factory import create_config_factory
-            
+
             with registry(database).cursor() as cr:
                 env = api.Environment(cr, SUPERUSER_ID, {})
                 
@@ -87,8 +86,40 @@ class ConfigCommand(Command):
                         return 1
                 else:
                     click.echo("Importing configurations...")
-                    result = factory.import_all(source)
-                    
+
+                    # Best-effort bulk-load tuning: skip WAL fsyncs and
+                    # per-row user triggers while the import runs.
+                    # Session-level SET (not LOCAL) because the importer
+                    # commits between batches; DISABLE TRIGGER needs the
+                    # Odoo DB role to own the table (or be superuser).
+                    triggers_disabled = False
+                    try:
+                        cr.execute("SET synchronous_commit = OFF")
+                        cr.execute(
+                            "ALTER TABLE ir_model_data DISABLE TRIGGER USER")
+                        triggers_disabled = True
+                    except Exception as e:
+                        cr.rollback()
+                        _logger.warning(
+                            f"Bulk-load tuning unavailable: {str(e)}")
+
+                    try:
+                        result = factory.import_all(source)
+                    finally:
+                        # A failed import leaves the cursor in an
+                        # aborted transaction; clear it first so the
+                        # re-enable cannot be rolled back and strand
+                        # user triggers disabled, and commit it since
+                        # the DISABLE was already committed by the
+                        # importer's per-batch commits
+                        cr.rollback()
+                        if triggers_disabled:
+                            cr.execute(
+                                "ALTER TABLE ir_model_data ENABLE TRIGGER USER")
+                            cr.commit()
+                        cr.execute("SET synchronous_commit = ON")
+
+
                     if result['success']:
                         click.echo(f"✓ Successfully imported {result['imported_config_types']} config types")
                         click.echo(f"✓ Total records: {result['total_imported_records']}")
@@ -110,9 +141,8 @@ class ConfigCommand(Command):
         """Validate configuration files without importing"""
         
         try:
-            from odoo import registry, api, SUPERUSER_ID
             from ..models.config_factory import create_config_factory
-            
+
             with registry(database).cursor() as cr:
                 env = api.Environment(cr, SUPERUSER_ID, {})
                 
@@ -1,4 +1,6 @@
 from . import config_factory
 from . import yaml_storage
-from . import config_exporter
-from . import config_importer
+
+# config_exporter and config_importer define plain classes, not Odoo
+# models; they are imported lazily by ConfigFactory so validate-only
+# runs don't pay their import cost
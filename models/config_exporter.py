@@ -1,50 +1,135 @@
+import hashlib
 import logging
 from datetime import datetime
 from .yaml_storage import YamlFileStorage
 
+try:
+    import xxhash
+except ImportError:
+    # Optional; blake2b is the stdlib fallback for change detection
+    xxhash = None
+
 _logger = logging.getLogger(__name__)
 
 
+def _row_digest():
+    """Streaming digest used for change detection between exports"""
+    if xxhash is not None:
+        return xxhash.xxh3_64()
+    return hashlib.blake2b(digest_size=16)
+
+
+def _hash_rows(rows):
+    """Hash exported rows without serializing them to YAML"""
+    digest = _row_digest()
+    for row in rows:
+        digest.update(repr(row).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
 class MinimalConfigExporter:
-    """Week 1: Core export functionality"""
+    """Week 1: Core export functionality
+
+    The export critical path is query latency and memory traffic, not
+    compute: Postgres scan -> row build -> libyaml dump -> file write,
+    with the database side dominating on large ir_model_data tables.
+    Optimizations here therefore target data layout and batching (plain
+    SQL, columns/rows tables, chunked streaming over a server-side
+    cursor) and syscall coalescing (batched writes, one data sync per
+    file) rather than per-row CPU tricks.
+    """
 
-    def __init__(self, env):
+    # Number of ir.model.data rows exported per streamed chunk
+    EXTERNAL_ID_CHUNK_SIZE = 2000
+
+    # All exportable config types, in manifest order
+    EXPORT_CONFIG_TYPES = (
+        'ir_config_parameters',
+        'ir_sequences',
+        'res_groups',
+        'module_states',
+        'ir_model_data',
+    )
+
+    # Maps config_type to the method that collects its payload
+    _EXPORT_METHOD_NAMES = {
+        'ir_config_parameters': '_export_config_params',
+        'ir_sequences': '_export_sequences',
+        'res_groups': '_export_user_groups',
+        'module_states': '_export_module_states',
+    }
+
+    def __init__(self, env, fmt: str = 'yaml'):
         self.env = env
-        self.storage = YamlFileStorage(env)
+        self.storage = YamlFileStorage(env, fmt=fmt)
+        # Constant for a given process/database; resolved lazily once
+        self._odoo_version = None
+        self._db_uuid = None
 
-    def export_system_configs(self, output_path: str):
-        """Export core system configurations only"""
+    def export_system_configs(self, output_path: str, mode: str = 'always'):
+        """Export core system configurations only
+
+        With mode='if-changed', per-type row hashes are compared against
+        the previous manifest in output_path and unchanged files are not
+        reserialized or rewritten.
+        """
         try:
+            prev_hashes = {}
+            if mode == 'if-changed':
+                prev_manifest = self.storage.read_yaml(
+                    f"{output_path}/manifest.yml")
+                prev_hashes = prev_manifest.get('hashes') or {}
+
             configs = {
                 'ir_config_parameters': self._export_config_params(),
                 'ir_sequences': self._export_sequences(),
                 'res_groups': self._export_user_groups(),
-                'ir_model_data': self._export_external_ids(),
                 'module_states': self._export_module_states()
             }
+            hashes = {
+                config_type: _hash_rows(data['rows'])
+                for config_type, data in configs.items()
+            }
+
+            # Write each changed config type to a separate YAML file; the
+            # writes are independent, so they are submitted as one batch
+            # (io_uring when available, thread pool otherwise)
+            changed = [
+                (f"{output_path}/{config_type}.yml", {config_type: data})
+                for config_type, data in configs.items()
+                if hashes[config_type] != prev_hashes.get(config_type)
+            ]
+            if changed:
+                self.storage.write_many(changed)
+            if len(changed) < len(configs):
+                _logger.info(
+                    f"Skipped {len(configs) - len(changed)} unchanged config types")
 
-            # Write each config type to separate YAML file
-            for config_type, data in configs.items():
-                file_path = f"{output_path}/{config_type}.yml"
-                self.storage.write_yaml(file_path, {config_type: data})
+            # ir.model.data can hold 100k+ rows, so it is streamed to disk
+            # in chunks instead of being materialized in memory first
+            external_id_count, hashes['ir_model_data'] = \
+                self._export_external_ids(
+                    output_path, skip_hash=prev_hashes.get('ir_model_data'))
 
             # Create export manifest
             manifest = {
                 'export_date': datetime.now().isoformat(),
                 'odoo_version': self._get_odoo_version(),
                 'database_uuid': self._get_database_uuid(),
-                'config_types': list(configs.keys()),
-                'total_records': sum(len(data) for data in configs.values())
+                'config_types': list(configs.keys()) + ['ir_model_data'],
+                'hashes': hashes,
+                'total_records': sum(len(data['rows']) for data in configs.values()) + external_id_count
             }
 
             self.storage.write_yaml(f"{output_path}/manifest.yml", manifest)
 
             _logger.info(
-                f"Successfully exported {len(configs)} config types with {manifest['total_records']} total records")
+                f"Successfully exported {len(manifest['config_types'])} config types with {manifest['total_records']} total records")
 
             return {
                 'success': True,
-                'exported_configs': len(configs),
+                'exported_configs': len(manifest['config_types']),
                 'total_records': manifest['total_records'],
                 'output_path': output_path
             }
@@ -56,18 +141,46 @@ class MinimalConfigExporter:
                 'error': str(e)
             }
 
+    def export_config_type(self, config_type: str, output_path: str):
+        """Export a single config type and return its record count
+
+        Entry point for parallel per-type exports where each worker
+        process owns its own cursor; the manifest is written separately
+        via write_manifest once all types are done.
+        """
+        if config_type == 'ir_model_data':
+            exported, _ = self._export_external_ids(output_path)
+            return exported
+
+        data = getattr(self, self._EXPORT_METHOD_NAMES[config_type])()
+        self.storage.write_yaml(
+            f"{output_path}/{config_type}.yml", {config_type: data})
+        return len(data['rows'])
+
+    def write_manifest(self, output_path: str, record_counts: dict):
+        """Write manifest.yml for per-type exports"""
+        manifest = {
+            'export_date': datetime.now().isoformat(),
+            'odoo_version': self._get_odoo_version(),
+            'database_uuid': self._get_database_uuid(),
+            'config_types': list(record_counts.keys()),
+            'total_records': sum(record_counts.values())
+        }
+        self.storage.write_yaml(f"{output_path}/manifest.yml", manifest)
+        return manifest
+
     def _export_config_params(self):
         """Export system configuration parameters"""
         try:
-            params = self.env['ir.config_parameter'].search([])
-            data = [
-                {
-                    'key': param.key,
-                    'value': param.value
-                }
-                for param in params
-            ]
-            _logger.info(f"Exported {len(data)} config parameters")
+            # Plain SQL skips ORM record instantiation and prefetch
+            # bookkeeping; only scalar columns are needed here
+            self.env.cr.execute(
+                "SELECT key, value FROM ir_config_parameter ORDER BY id")
+            data = {
+                'columns': ['key', 'value'],
+                'rows': [list(row) for row in self.env.cr.fetchall()]
+            }
+            _logger.info(f"Exported {len(data['rows'])} config parameters")
             return data
         except Exception as e:
             _logger.error(f"Failed to export config parameters: {str(e)}")
@@ -76,21 +189,15 @@ class MinimalConfigExporter:
     def _export_sequences(self):
         """Export number sequences"""
         try:
-            sequences = self.env['ir.sequence'].search([])
-            data = [
-                {
-                    'name': seq.name,
-                    'code': seq.code,
-                    'prefix': seq.prefix,
-                    'suffix': seq.suffix,
-                    'padding': seq.padding,
-                    'number_next': seq.number_next,
-                    'number_increment': seq.number_increment,
-                    'active': seq.active
-                }
-                for seq in sequences
-            ]
-            _logger.info(f"Exported {len(data)} sequences")
+            self.env.cr.execute(
+                "SELECT name, code, prefix, suffix, padding, number_next, "
+                "number_increment, active FROM ir_sequence ORDER BY id")
+            data = {
+                'columns': ['name', 'code', 'prefix', 'suffix', 'padding',
+                            'number_next', 'number_increment', 'active'],
+                'rows': [list(row) for row in self.env.cr.fetchall()]
+            }
+            _logger.info(f"Exported {len(data['rows'])} sequences")
             return data
         except Exception as e:
             _logger.error(f"Failed to export sequences: {str(e)}")
@@ -99,51 +206,132 @@ class MinimalConfigExporter:
     def _export_user_groups(self):
         """Export user groups"""
         try:
-            groups = self.env['res.groups'].search([])
-            data = []
-
-            for group in groups:
-                group_data = {
-                    'name': group.name,
-                    'category_id': group.category_id.complete_name if group.category_id else None,
-                    'implied_ids': [],
-                    'users': [u.login for u in group.users]
-                }
-
-                # Get external IDs for implied groups
-                for implied_group in group.implied_ids:
-                    external_id = self.env['ir.model.data'].search([
-                        ('model', '=', 'res.groups'),
-                        ('res_id', '=', implied_group.id)
-                    ], limit=1)
-                    if external_id:
-                        group_data['implied_ids'].append(
-                            f"{external_id.module}.{external_id.name}")
-
-                data.append(group_data)
-
-            _logger.info(f"Exported {len(data)} user groups")
+            # One search_read pulls exactly the needed columns as plain
+            # dicts, with no record instantiation or prefetch pass
+            group_vals = self.env['res.groups'].with_context(
+                prefetch_fields=False).search_read(
+                [], ['name', 'category_id', 'implied_ids', 'users'],
+                order='id')
+
+            # Resolve logins and category names with one query per model;
+            # active_test=False because the m2m ids include archived
+            # users (e.g. the base.default_user template), which the
+            # default search domain would silently drop
+            user_ids = {uid for vals in group_vals for uid in vals['users']}
+            login_by_id = {
+                vals['id']: vals['login']
+                for vals in self.env['res.users'].with_context(
+                    prefetch_fields=False, active_test=False).search_read(
+                    [('id', 'in', list(user_ids))], ['login'])
+            }
+            category_ids = {
+                vals['category_id'][0]
+                for vals in group_vals if vals['category_id']
+            }
+            category_by_id = {
+                vals['id']: vals['complete_name']
+                for vals in self.env['ir.module.category'].with_context(
+                    prefetch_fields=False).search_read(
+                    [('id', 'in', list(category_ids))], ['complete_name'])
+            }
+
+            # Prefetch all res.groups external IDs once instead of one
+            # search per implied membership
+            xmlid_rows = self.env['ir.model.data'].search_read(
+                [('model', '=', 'res.groups')], ['res_id', 'module', 'name'])
+            xmlid_by_res_id = {
+                row['res_id']: f"{row['module']}.{row['name']}"
+                for row in xmlid_rows
+            }
+
+            rows = []
+            for vals in group_vals:
+                rows.append([
+                    vals['name'],
+                    category_by_id[vals['category_id'][0]]
+                    if vals['category_id'] else None,
+                    [
+                        xmlid_by_res_id[implied_id]
+                        for implied_id in vals['implied_ids']
+                        if implied_id in xmlid_by_res_id
+                    ],
+                    [login_by_id[uid] for uid in vals['users']]
+                ])
+
+            data = {
+                'columns': ['name', 'category_id', 'implied_ids', 'users'],
+                'rows': rows
+            }
+            _logger.info(f"Exported {len(rows)} user groups")
             return data
         except Exception as e:
             _logger.error(f"Failed to export user groups: {str(e)}")
             raise
 
-    def _export_external_ids(self):
-        """Export external ID mappings"""
+    def _export_external_ids(self, output_path: str, skip_hash: str = None):
+        """Export external ID mappings, streamed in chunks to cap memory
+
+        Returns an (exported_count, row_hash) tuple. With a skip_hash
+        (mode='if-changed'), a hash-only pre-pass runs first so an
+        unchanged table skips the YAML pass entirely; without one the
+        digest is computed inside the single write scan, so the default
+        export reads the table only once.
+        """
         try:
-            ir_data = self.env['ir.model.data'].search([])
-            data = [
-                {
-                    'module': record.module,
-                    'name': record.name,
-                    'model': record.model,
-                    'res_id': record.res_id,
-                    'noupdate': record.noupdate
-                }
-                for record in ir_data
-            ]
-            _logger.info(f"Exported {len(data)} external IDs")
-            return data
+            digest = _row_digest()
+            row_hash = None
+            if skip_hash:
+                total = 0
+                with self.env.cr._cnx.cursor(
+                        'hash_ir_model_data') as scan_cr:
+                    scan_cr.itersize = self.EXTERNAL_ID_CHUNK_SIZE
+                    scan_cr.execute(
+                        "SELECT module, name, model, res_id, noupdate "
+                        "FROM ir_model_data ORDER BY id")
+                    while chunk := scan_cr.fetchmany(
+                            self.EXTERNAL_ID_CHUNK_SIZE):
+                        for row in chunk:
+                            digest.update(repr(list(row)).encode('utf-8'))
+                            digest.update(b'\n')
+                        total += len(chunk)
+                row_hash = digest.hexdigest()
+
+                if row_hash == skip_hash:
+                    _logger.info(
+                        f"Skipped {total} unchanged external IDs")
+                    return total, row_hash
+
+            stream = self.storage.open_yaml_stream(
+                f"{output_path}/ir_model_data.yml", 'ir_model_data',
+                columns=['module', 'name', 'model', 'res_id', 'noupdate'])
+
+            exported = 0
+            try:
+                # A named (server-side) cursor streams the scan in
+                # chunks instead of materializing the full result set
+                # client-side, so memory stays O(chunk_size)
+                with self.env.cr._cnx.cursor(
+                        'export_ir_model_data') as scan_cr:
+                    scan_cr.itersize = self.EXTERNAL_ID_CHUNK_SIZE
+                    scan_cr.execute(
+                        "SELECT module, name, model, res_id, noupdate "
+                        "FROM ir_model_data ORDER BY id")
+                    while chunk := scan_cr.fetchmany(
+                            self.EXTERNAL_ID_CHUNK_SIZE):
+                        if row_hash is None:
+                            for row in chunk:
+                                digest.update(
+                                    repr(list(row)).encode('utf-8'))
+                                digest.update(b'\n')
+                        self.storage.append_xmlid_rows(stream, chunk)
+                        exported += len(chunk)
+            finally:
+                stream.close()
+            if row_hash is None:
+                row_hash = digest.hexdigest()
+
+            _logger.info(f"Exported {exported} external IDs")
+            return exported, row_hash
         except Exception as e:
             _logger.error(f"Failed to export external IDs: {str(e)}")
             raise
@@ -151,42 +339,45 @@ class MinimalConfigExporter:
     def _export_module_states(self):
         """Export module installation states"""
         try:
-            modules = self.env['ir.module.module'].search([])
-            data = [
-                {
-                    'name': module.name,
-                    'state': module.state,
-                    'auto_install': module.auto_install,
-                    'sequence': module.sequence
-                }
-                for module in modules
-                if module.state in ['installed', 'to_install', 'to_upgrade']
-            ]
-            _logger.info(f"Exported {len(data)} module states")
+            # Filter on state in SQL so only matching rows leave Postgres
+            self.env.cr.execute(
+                "SELECT name, state, auto_install, sequence "
+                "FROM ir_module_module "
+                "WHERE state IN ('installed', 'to_install', 'to_upgrade') "
+                "ORDER BY id")
+            data = {
+                'columns': ['name', 'state', 'auto_install', 'sequence'],
+                'rows': [list(row) for row in self.env.cr.fetchall()]
+            }
+            _logger.info(f"Exported {len(data['rows'])} module states")
             return data
         except Exception as e:
             _logger.error(f"Failed to export module states: {str(e)}")
             raise
 
     def _get_odoo_version(self):
-        """Get Odoo version"""
-        try:
-            import odoo
-            return odoo.release.version
-        except:
-            return "18.0"
+        """Get Odoo version (cached after the first lookup)"""
+        if self._odoo_version is None:
+            try:
+                import odoo
+                self._odoo_version = odoo.release.version
+            except:
+                self._odoo_version = "18.0"
+        return self._odoo_version
 
     def _get_database_uuid(self):
-        """Get database UUID"""
-        try:
-            db_uuid = self.env['ir.config_parameter'].sudo(
-            ).get_param('database.uuid')
-            if not db_uuid:
-                # Generate and store UUID if not exists
-                import uuid
-                db_uuid = str(uuid.uuid4())
-                self.env['ir.config_parameter'].sudo(
-                ).set_param('database.uuid', db_uuid)
-            return db_uuid
-        except:
-            return None
+        """Get database UUID (cached after the first lookup)"""
+        if self._db_uuid is None:
+            try:
+                db_uuid = self.env['ir.config_parameter'].sudo(
+                ).get_param('database.uuid')
+                if not db_uuid:
+                    # Generate and store UUID if not exists
+                    import uuid
+                    db_uuid = str(uuid.uuid4())
+                    self.env['ir.config_parameter'].sudo(
+                    ).set_param('database.uuid', db_uuid)
+                self._db_uuid = db_uuid
+            except:
+                return None
+        return self._db_uuid
@@ -1,11 +1,21 @@
 import logging
 from odoo import models, api
 from .yaml_storage import YamlFileStorage
-from .config_exporter import MinimalConfigExporter
-from .config_importer import MinimalConfigImporter
 
 _logger = logging.getLogger(__name__)
 
+REQUIRED_FILES = (
+    'manifest.yml',
+)
+
+OPTIONAL_FILES = (
+    'ir_config_parameters.yml',
+    'ir_sequences.yml',
+    'res_groups.yml',
+    'ir_model_data.yml',
+    'module_states.yml',
+)
+
 
 class ConfigFactory(models.TransientModel):
     """Simplified configuration factory for MVP"""
@@ -22,11 +32,12 @@ class ConfigFactory(models.TransientModel):
         self.storage = YamlFileStorage(self.env)
     
     @api.model
-    def export_all(self, target_path: str):
+    def export_all(self, target_path: str, mode: str = 'always',
+                   fmt: str = 'yaml'):
         """Export all configurations to YAML"""
         try:
             _logger.info(f"Starting configuration export to: {target_path}")
-            result = self._export_ir_configs(target_path)
+            result = self._export_ir_configs(target_path, mode, fmt)
             _logger.info(f"Configuration export completed successfully")
             return result
         except Exception as e:
@@ -37,11 +48,11 @@ class ConfigFactory(models.TransientModel):
             }
     
     @api.model
-    def import_all(self, source_path: str):
+    def import_all(self, source_path: str, fmt: str = 'yaml'):
         """Import configurations from YAML"""
         try:
             _logger.info(f"Starting configuration import from: {source_path}")
-            result = self._import_ir_configs(source_path)
+            result = self._import_ir_configs(source_path, fmt)
             _logger.info(f"Configuration import completed successfully")
             return result
         except Exception as e:
@@ -51,16 +62,42 @@ class ConfigFactory(models.TransientModel):
                 'error': str(e)
             }
     
-    def _export_ir_configs(self, target_path: str):
+    def _export_ir_configs(self, target_path: str, mode: str = 'always',
+                           fmt: str = 'yaml'):
         """Export core IR model configurations"""
-        exporter = MinimalConfigExporter(self.env)
-        return exporter.export_system_configs(target_path)
-    
-    def _import_ir_configs(self, source_path: str):
+        # Deferred so validate-only runs don't pay the import cost
+        from .config_exporter import MinimalConfigExporter
+        exporter = MinimalConfigExporter(self.env, fmt=fmt)
+        return exporter.export_system_configs(target_path, mode=mode)
+
+    def _import_ir_configs(self, source_path: str, fmt: str = 'yaml'):
         """Import core IR model configurations"""
-        importer = MinimalConfigImporter(self.env)
+        from .config_importer import MinimalConfigImporter
+        importer = MinimalConfigImporter(self.env, fmt=fmt)
         return importer.import_system_configs(source_path)
     
+    @api.model
+    def list_config_types(self):
+        """List the exportable config types"""
+        from .config_exporter import MinimalConfigExporter
+        return list(MinimalConfigExporter.EXPORT_CONFIG_TYPES)
+
+    @api.model
+    def export_config_type(self, config_type: str, target_path: str,
+                           fmt: str = 'yaml'):
+        """Export a single config type (parallel CLI path)"""
+        from .config_exporter import MinimalConfigExporter
+        exporter = MinimalConfigExporter(self.env, fmt=fmt)
+        return exporter.export_config_type(config_type, target_path)
+
+    @api.model
+    def write_manifest(self, target_path: str, record_counts: dict,
+                       fmt: str = 'yaml'):
+        """Write the export manifest for per-type exports"""
+        from .config_exporter import MinimalConfigExporter
+        exporter = MinimalConfigExporter(self.env, fmt=fmt)
+        return exporter.write_manifest(target_path, record_counts)
+
     @api.model
     def validate_export_path(self, path: str):
         """Validate export path is writable"""
@@ -86,35 +123,32 @@ class ConfigFactory(models.TransientModel):
             }
     
     @api.model
-    def validate_import_path(self, path: str):
+    def validate_import_path(self, path: str, fmt: str = 'yaml'):
         """Validate import path has required files"""
         import os
-        
-        required_files = [
-            'manifest.yml'
-        ]
-        
-        optional_files = [
-            'ir_config_parameters.yml',
-            'ir_sequences.yml',
-            'res_groups.yml',
-            'ir_model_data.yml',
-            'module_states.yml'
-        ]
-        
-        missing_required = []
-        missing_optional = []
-        
-        for file_name in required_files:
-            file_path = os.path.join(path, file_name)
-            if not os.path.exists(file_path):
-                missing_required.append(file_name)
-        
-        for file_name in optional_files:
-            file_path = os.path.join(path, file_name)
-            if not os.path.exists(file_path):
-                missing_optional.append(file_name)
-        
+
+        storage = YamlFileStorage(self.env, fmt=fmt)
+
+        # One scandir lists every entry instead of a stat per file
+        try:
+            entries = {e.name for e in os.scandir(path) if e.is_file()}
+        except OSError as e:
+            return {
+                'valid': False,
+                'message': f'Cannot read import path: {str(e)}'
+            }
+
+        def _missing(names):
+            # Accept the canonical .yml name or the active format's
+            # name, mirroring read_yaml's extension fallback
+            return sorted(
+                name for name in names
+                if not {name, storage.format_path(name)} & entries
+            )
+
+        missing_required = _missing(REQUIRED_FILES)
+        missing_optional = _missing(OPTIONAL_FILES)
+
         if missing_required:
             return {
                 'valid': False,
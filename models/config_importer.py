@@ -2,15 +2,43 @@ import os
 import logging
 from .yaml_storage import YamlFileStorage
 
+try:
+    # Optional Cython/mypyc build of the per-row hot path
+    from . import _import_fastpath_c as _fastpath
+except ImportError:
+    from . import _import_fastpath as _fastpath
+
 _logger = logging.getLogger(__name__)
 
+# Import in dependency order; ir_model_data comes last because it
+# references records of the other types
+IMPORT_ORDER = (
+    'ir_config_parameters',
+    'res_groups',
+    'ir_sequences',
+    'module_states',
+    'ir_model_data',
+)
+
 
 class MinimalConfigImporter:
     """Week 2: Core import functionality"""
 
-    def __init__(self, env):
+    # Number of records created per batched ORM create() call
+    IMPORT_BATCH_SIZE = 2000
+
+    # Maps config_type to the method that imports it
+    _IMPORT_METHOD_NAMES = {
+        'ir_config_parameters': '_import_config_params',
+        'ir_sequences': '_import_sequences',
+        'res_groups': '_import_user_groups',
+        'ir_model_data': '_import_external_ids',
+        'module_states': '_import_module_states',
+    }
+
+    def __init__(self, env, fmt: str = 'yaml'):
         self.env = env
-        self.storage = YamlFileStorage(env)
+        self.storage = YamlFileStorage(env, fmt=fmt)
 
     def import_system_configs(self, source_path: str):
         """Import core system configurations with basic validation"""
@@ -23,21 +51,18 @@ class MinimalConfigImporter:
                     'error': 'No manifest file found or invalid manifest'
                 }
 
-            # Import in dependency order
-            import_order = [
-                'ir_config_parameters',
-                'res_groups',
-                'ir_sequences',
-                'module_states',
-                'ir_model_data'  # Last because it references other records
-            ]
-
             results = []
             imported_count = 0
 
-            for config_type in import_order:
+            # List the source directory once instead of a stat per type
+            available_files = {
+                e.name for e in os.scandir(source_path) if e.is_file()
+            }
+
+            for config_type in IMPORT_ORDER:
                 try:
-                    result = self._import_config_type(config_type, source_path)
+                    result = self._import_config_type(
+                        config_type, source_path, available_files)
                     results.append(result)
 
                     if result['success']:
@@ -65,7 +90,7 @@ class MinimalConfigImporter:
 
             return {
                 'success': True,
-                'imported_config_types': len(import_order),
+                'imported_config_types': len(IMPORT_ORDER),
                 'total_imported_records': imported_count,
                 'results': results
             }
@@ -77,11 +102,18 @@ class MinimalConfigImporter:
                 'error': str(e)
             }
 
-    def _import_config_type(self, config_type: str, source_path: str):
+    def _import_config_type(self, config_type: str, source_path: str,
+                            available_files: set):
         """Import specific configuration type"""
         try:
             file_path = f"{source_path}/{config_type}.yml"
-            if not os.path.exists(file_path):
+            # read_yaml falls back to .yml when the active format's
+            # file is absent, so accept either name here
+            candidates = {
+                f"{config_type}.yml",
+                os.path.basename(self.storage.format_path(file_path)),
+            }
+            if not candidates & available_files:
                 return {
                     'success': True,
                     'config_type': config_type,
@@ -90,18 +122,11 @@ class MinimalConfigImporter:
                 }
 
             data = self.storage.read_yaml(file_path)
-            config_data = data.get(config_type, [])
+            config_data = self._rows_to_dicts(data.get(config_type, []))
 
             # Route to appropriate import method
-            import_methods = {
-                'ir_config_parameters': self._import_config_params,
-                'ir_sequences': self._import_sequences,
-                'res_groups': self._import_user_groups,
-                'ir_model_data': self._import_external_ids,
-                'module_states': self._import_module_states
-            }
-
-            import_method = import_methods.get(config_type)
+            method_name = self._IMPORT_METHOD_NAMES.get(config_type)
+            import_method = getattr(self, method_name) if method_name else None
             if not import_method:
                 return {
                     'success': False,
@@ -128,105 +153,193 @@ class MinimalConfigImporter:
                 'error': str(e)
             }
 
-    def _import_config_params(self, params_data):
-        """Import system configuration parameters"""
+    def _rows_to_dicts(self, config_data):
+        """Normalize a columns/rows table payload to a list of row dicts
+
+        Exports use the compact {'columns': [...], 'rows': [...]} layout;
+        older list-of-dicts files pass through unchanged.
+        """
+        if isinstance(config_data, dict) and 'columns' in config_data:
+            columns = config_data['columns']
+            return [
+                dict(zip(columns, row))
+                for row in config_data.get('rows') or []
+            ]
+        return config_data or []
+
+    def _validate_rows(self, rows_data, required_keys, config_label):
+        """Filter out malformed rows once, before any database work
+
+        Validating up front keeps the import batches free of per-row
+        try/except; a bad row is skipped and logged instead of raising
+        mid-batch. The per-row work lives in _import_fastpath.
+        """
+        valid, skipped = _fastpath.validate_rows(rows_data, required_keys)
+        if skipped:
+            _logger.warning(
+                f"Skipped {skipped} malformed {config_label} rows")
+        return valid
+
+    def _release_batch(self):
+        """Commit work done so far and drop the ORM cache
+
+        Called between import batches so the prefetch cache stays
+        O(batch_size) instead of growing with the whole import.
+        """
+        self.env.cr.commit()
+        self.env.invalidate_all()
+
+    def _batch_create(self, model_name, to_create):
+        """Create records with batched create() calls"""
         imported = 0
-
-        for param_data in params_data:
+        model = self.env[model_name]
+        for offset in range(0, len(to_create), self.IMPORT_BATCH_SIZE):
+            batch = to_create[offset:offset + self.IMPORT_BATCH_SIZE]
             try:
-                existing = self.env['ir.config_parameter'].search([
-                    ('key', '=', param_data['key'])
-                ])
-
-                if existing:
-                    existing.value = param_data['value']
-                else:
-                    self.env['ir.config_parameter'].create({
-                        'key': param_data['key'],
-                        'value': param_data['value']
-                    })
-
-                imported += 1
+                model.create(batch)
+                imported += len(batch)
             except Exception as e:
                 _logger.warning(
-                    f"Failed to import config parameter {param_data.get('key')}: {str(e)}")
-
+                    f"Failed to create {len(batch)} {model_name} records: {str(e)}")
+            self._release_batch()
         return imported
 
-    def _import_sequences(self, sequences_data):
-        """Import number sequences"""
+    def _batch_write(self, model_name, to_update):
+        """Write updates grouped by identical vals, one write() per group"""
         imported = 0
+        model = self.env[model_name]
 
-        for seq_data in sequences_data:
-            try:
-                existing = self.env['ir.sequence'].search([
-                    ('code', '=', seq_data['code'])
-                ])
+        ids_by_vals = {}
+        for record_id, vals in to_update:
+            key = tuple(sorted(vals.items()))
+            ids_by_vals.setdefault(key, []).append(record_id)
 
-                if existing:
-                    # Update existing sequence (but don't update number_next to avoid conflicts)
-                    update_data = seq_data.copy()
-                    # Remove number_next to avoid conflicts
-                    update_data.pop('number_next', None)
-                    existing.write(update_data)
-                else:
-                    # Create new sequence
-                    self.env['ir.sequence'].create(seq_data)
-
-                imported += 1
+        since_release = 0
+        for vals_key, record_ids in ids_by_vals.items():
+            try:
+                model.browse(record_ids).write(dict(vals_key))
+                imported += len(record_ids)
             except Exception as e:
                 _logger.warning(
-                    f"Failed to import sequence {seq_data.get('code')}: {str(e)}")
-
+                    f"Failed to update {len(record_ids)} {model_name} records: {str(e)}")
+            since_release += len(record_ids)
+            if since_release >= self.IMPORT_BATCH_SIZE:
+                self._release_batch()
+                since_release = 0
+        if since_release:
+            self._release_batch()
         return imported
 
-    def _import_user_groups(self, groups_data):
-        """Import user groups (simplified for MVP)"""
-        imported = 0
+    def _import_config_params(self, params_data):
+        """Import system configuration parameters"""
+        params_data = self._validate_rows(
+            params_data, ('key', 'value'), 'config parameter')
+        if not params_data:
+            return 0
 
-        for group_data in groups_data:
-            try:
-                existing = self.env['res.groups'].search([
-                    ('name', '=', group_data['name'])
-                ])
+        # One query up front instead of one search per parameter
+        self.env.cr.execute("SELECT id, key FROM ir_config_parameter")
+        existing = {key: param_id for param_id, key in self.env.cr.fetchall()}
 
-                if not existing:
-                    # Create basic group structure
-                    # Skip complex relationships for MVP
-                    self.env['res.groups'].create({
-                        'name': group_data['name']
-                    })
-                    imported += 1
+        to_create, to_update = _fastpath.split_existing(
+            params_data, existing, ('key',))
 
-            except Exception as e:
-                _logger.warning(
-                    f"Failed to import user group {group_data.get('name')}: {str(e)}")
+        imported = self._batch_create('ir.config_parameter', [
+            {'key': row['key'], 'value': row['value']} for row in to_create
+        ])
+        imported += self._batch_write('ir.config_parameter', [
+            (param_id, {'value': row['value']}) for param_id, row in to_update
+        ])
 
         return imported
 
-    def _import_external_ids(self, external_ids_data):
-        """Import external ID mappings"""
-        imported = 0
+    def _import_sequences(self, sequences_data):
+        """Import number sequences"""
+        sequences_data = self._validate_rows(
+            sequences_data, ('name', 'code'), 'sequence')
+        if not sequences_data:
+            return 0
 
-        for record_data in external_ids_data:
-            try:
-                existing = self.env['ir.model.data'].search([
-                    ('module', '=', record_data['module']),
-                    ('name', '=', record_data['name'])
-                ])
+        self.env.cr.execute(
+            "SELECT id, code FROM ir_sequence WHERE code IS NOT NULL")
+        existing = {code: seq_id for seq_id, code in self.env.cr.fetchall()}
 
-                if existing:
-                    existing.write(record_data)
-                else:
-                    self.env['ir.model.data'].create(record_data)
+        to_create, to_update = _fastpath.split_existing(
+            sequences_data, existing, ('code',))
 
-                imported += 1
-            except Exception as e:
-                _logger.warning(
-                    f"Failed to import external ID {record_data.get('module')}.{record_data.get('name')}: {str(e)}")
+        imported = self._batch_create('ir.sequence', to_create)
+
+        # Don't update number_next on existing sequences to avoid conflicts
+        updates = []
+        for seq_id, seq_data in to_update:
+            update_data = seq_data.copy()
+            update_data.pop('number_next', None)
+            updates.append((seq_id, update_data))
+        imported += self._batch_write('ir.sequence', updates)
 
         return imported
 
+    def _import_user_groups(self, groups_data):
+        """Import user groups (simplified for MVP)"""
+        groups_data = self._validate_rows(groups_data, ('name',), 'user group')
+        if not groups_data:
+            return 0
+
+        # One name IN (...) search instead of one query per group
+        names = [row['name'] for row in groups_data]
+        existing = set(self.env['res.groups'].search(
+            [('name', 'in', names)]).mapped('name'))
+
+        # Create basic group structure only;
+        # skip complex relationships for MVP
+        seen = set()
+        to_create = []
+        for row in groups_data:
+            if row['name'] not in existing and row['name'] not in seen:
+                to_create.append({'name': row['name']})
+                seen.add(row['name'])
+
+        return self._batch_create('res.groups', to_create)
+
+    def _import_external_ids(self, external_ids_data):
+        """Import external ID mappings"""
+        external_ids_data = self._validate_rows(
+            external_ids_data, ('module', 'name', 'model', 'res_id'),
+            'external ID')
+        if not external_ids_data:
+            return 0
+
+        # One query up front instead of one search per external ID
+        self.env.cr.execute(
+            "SELECT id, module, name, model, res_id, noupdate "
+            "FROM ir_model_data")
+        existing_ids = {}
+        existing_vals = {}
+        for record_id, module, name, model, res_id, noupdate \
+                in self.env.cr.fetchall():
+            existing_ids[(module, name)] = record_id
+            existing_vals[(module, name)] = (model, res_id, noupdate)
+
+        # Re-imports typically touch few rows; rows whose payload
+        # already matches the database are not rewritten at all
+        changed = [
+            row for row in external_ids_data
+            if existing_vals.get((row['module'], row['name'])) !=
+            (row['model'], row['res_id'], row.get('noupdate', False))
+        ]
+        skipped = len(external_ids_data) - len(changed)
+
+        to_create, to_update = _fastpath.split_existing(
+            changed, existing_ids, ('module', 'name'))
+
+        created = self._batch_create('ir.model.data', to_create)
+        updated = self._batch_write('ir.model.data', to_update)
+        _logger.info(
+            f"External IDs: {created} created, {updated} updated, "
+            f"{skipped} unchanged")
+
+        return created + updated + skipped
+
     def _import_module_states(self, modules_data):
         """Import module installation states (read-only for MVP)"""
         imported = 0
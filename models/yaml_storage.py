@@ -1,92 +1,433 @@
+import concurrent.futures
+import copy
+import functools
+import gc
+import json
 import yaml
 import os
 import logging
 
+from psycopg2.extras import execute_values
+
+try:
+    import orjson
+except ImportError:
+    # Optional fast JSON codec; the stdlib json module is the fallback
+    orjson = None
+
+try:
+    import liburing
+except ImportError:
+    # Optional Linux-only fast path for batched file writes
+    liburing = None
+
+try:
+    import msgpack
+except ImportError:
+    # Optional fast interchange format for bulk tables
+    msgpack = None
+
 _logger = logging.getLogger(__name__)
 
+# Prefer the libyaml-backed C implementation when PyYAML was built with it;
+# it parses/serializes several times faster than the pure-Python fallback.
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+if Loader is yaml.SafeLoader:
+    _logger.warning(
+        "PyYAML was built without libyaml; falling back to the pure-Python "
+        "loader/dumper, YAML handling will be noticeably slower")
+
+
+@functools.lru_cache(maxsize=128)
+def _load_cached(file_path: str, mtime_ns: int, size: int):
+    """Parse a config file, cached by path plus stat signature
+
+    Validate-then-import flows read the same files twice; keying on
+    (mtime_ns, size) means an unchanged file is parsed only once and a
+    rewritten file naturally misses the cache. The codec is picked by
+    extension, so YAML, JSON and msgpack files share the cache.
+    """
+    ext = os.path.splitext(file_path)[1]
+    # Binary mode lets the C loader consume raw UTF-8 bytes without
+    # going through Python's text IO decode layer
+    with open(file_path, 'rb') as f:
+        if ext == '.json':
+            if orjson is not None:
+                return orjson.loads(f.read())
+            return json.loads(f.read())
+        if ext == '.msgpack':
+            return msgpack.unpackb(f.read(), raw=False)
+        return yaml.load(f, Loader=Loader)
+
 
 class YamlFileStorage:
-    """Simple YAML file storage for MVP"""
+    """Simple YAML file storage for MVP
+
+    YAML stays the default, human-editable format; `fmt` switches the
+    serialization of whole-document payloads to JSON or msgpack for
+    faster machine-to-machine round trips. Reads fall back to the YAML
+    file when the format-specific one is absent.
+    """
+
+    # Number of ir.model.data rows fetched per search_read chunk
+    EXPORT_CHUNK_SIZE = 10000
+
+    # Number of ir.model.data rows upserted per committed chunk
+    UPSERT_CHUNK_SIZE = 5000
+
+    # Rows between explicit gc passes during large imports
+    GC_ROW_INTERVAL = 50000
 
-    def __init__(self, env):
+    # Supported serialization formats and their file extensions
+    FORMAT_EXTENSIONS = {
+        'yaml': '.yml',
+        'json': '.json',
+        'msgpack': '.msgpack',
+    }
+
+    def __init__(self, env, fmt: str = 'yaml'):
+        if fmt not in self.FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported storage format: {fmt}")
+        if fmt == 'msgpack' and msgpack is None:
+            raise ValueError(
+                "msgpack format requested but msgpack is not installed")
         self.env = env
+        self.fmt = fmt
+        # Directories already created by this instance; writing dozens
+        # of files to one export dir needs only one makedirs
+        self._mkdir_cache = set()
+
+    def format_path(self, file_path: str) -> str:
+        """Map a canonical .yml path to the active format's path"""
+        if self.fmt == 'yaml':
+            return file_path
+        base, _ = os.path.splitext(file_path)
+        return base + self.FORMAT_EXTENSIONS[self.fmt]
+
+    def _dump_blob(self, data: dict, sort_keys: bool = False) -> bytes:
+        """Serialize a payload to bytes in the active format"""
+        if self.fmt == 'json':
+            if orjson is not None:
+                return orjson.dumps(data)
+            return json.dumps(data, ensure_ascii=False).encode('utf-8')
+        if self.fmt == 'msgpack':
+            return msgpack.packb(data, use_bin_type=True)
+        return yaml.dump(data, Dumper=Dumper, encoding='utf-8',
+                         default_flow_style=None, sort_keys=sort_keys)
+
+    def _ensure_dir(self, file_path: str):
+        """Create the parent directory once per storage instance"""
+        dirname = os.path.dirname(file_path)
+        if dirname not in self._mkdir_cache:
+            os.makedirs(dirname, exist_ok=True)
+            self._mkdir_cache.add(dirname)
+
+    def write_yaml(self, file_path: str, data: dict,
+                   sort_keys: bool = False):
+        """Write data to a config file in the active format
+
+        `file_path` is the canonical .yml path; the extension is swapped
+        for non-YAML formats. Callers build their mappings in canonical
+        order already, so key sorting in the emitter is off by default.
+        """
+        file_path = self.format_path(file_path)
+        try:
+            self._ensure_dir(file_path)
+
+            # Binary mode with explicit encoding lets the C dumper emit
+            # UTF-8 bytes directly, bypassing the text IO encode layer;
+            # for YAML, default_flow_style=None keeps mappings in block
+            # style but emits scalar-only rows as compact flow sequences
+            with open(file_path, 'wb') as f:
+                f.write(self._dump_blob(data, sort_keys=sort_keys))
+
+            _logger.info("Successfully wrote YAML file: %s", file_path)
+        except Exception as e:
+            _logger.error("Failed to write YAML file %s: %s", file_path, e)
+            raise
+
+    def write_many(self, entries: list):
+        """Write several YAML files in one batch
 
-    def write_yaml(self, file_path: str, data: dict):
-        """Write data to YAML file"""
+        `entries` is a list of (file_path, data) tuples. Payloads are
+        serialized up front; on Linux with python-liburing installed the
+        write+fsync pairs are submitted to the kernel as one io_uring
+        batch, otherwise the files are written from a thread pool.
+        """
         try:
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            payloads = []
+            for file_path, data in entries:
+                file_path = self.format_path(file_path)
+                self._ensure_dir(file_path)
+                payloads.append((file_path, self._dump_blob(data)))
 
-            with open(file_path, 'w') as f:
-                yaml.dump(data, f, default_flow_style=False, sort_keys=True)
+            if liburing is not None:
+                try:
+                    self._write_many_io_uring(payloads)
+                    return
+                except Exception as e:
+                    _logger.warning(
+                        "io_uring batch write failed, falling back to "
+                        "threaded writes: %s", e)
 
-            _logger.info(f"Successfully wrote YAML file: {file_path}")
+            self._write_many_threaded(payloads)
         except Exception as e:
-            _logger.error(f"Failed to write YAML file {file_path}: {str(e)}")
+            _logger.error("Failed to batch-write YAML files: %s", e)
             raise
 
+    def _write_many_io_uring(self, payloads):
+        """Submit all write+fsync pairs in a single io_uring batch"""
+        fds = []
+        ring = liburing.io_uring()
+        try:
+            liburing.io_uring_queue_init(2 * len(payloads), ring, 0)
+
+            for file_path, blob in payloads:
+                fd = os.open(file_path,
+                             os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                fds.append(fd)
+
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_write(sqe, fd, blob, len(blob), 0)
+                # Link the fsync so it runs only after its write completes
+                sqe.flags |= liburing.IOSQE_IO_LINK
+
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_fsync(sqe, fd, 0)
+
+            liburing.io_uring_submit_and_wait(ring, 2 * len(payloads))
+
+            cqe = liburing.io_uring_cqe()
+            for _ in range(2 * len(payloads)):
+                liburing.io_uring_wait_cqe(ring, cqe)
+                if cqe.res < 0:
+                    raise OSError(-cqe.res, os.strerror(-cqe.res))
+                liburing.io_uring_cqe_seen(ring, cqe)
+        finally:
+            liburing.io_uring_queue_exit(ring)
+            for fd in fds:
+                os.close(fd)
+
+    def _write_many_threaded(self, payloads):
+        """Blocking-I/O fallback: write each file from a thread pool"""
+        def _write(payload):
+            file_path, blob = payload
+            fd = os.open(file_path,
+                         os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, blob)
+                # fdatasync skips the metadata flush fsync would add
+                os.fdatasync(fd)
+                if hasattr(os, 'posix_fadvise'):
+                    # Exports are not re-read by this process, so drop
+                    # their pages instead of polluting the page cache
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+            _logger.info("Successfully wrote YAML file: %s", file_path)
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(len(payloads), os.cpu_count() or 1)) as executor:
+            list(executor.map(_write, payloads))
+
+    def open_yaml_stream(self, file_path: str, root_key: str,
+                         columns: list = None):
+        """Open a YAML file for incremental list output under root_key
+
+        With `columns`, the file is laid out as a columns/rows table and
+        appended items are expected to be row sequences.
+        """
+        try:
+            self._ensure_dir(file_path)
+
+            stream = open(file_path, 'w')
+            stream.write(f"{root_key}:\n")
+            if columns:
+                stream.write(
+                    f"  columns: {yaml.dump(list(columns), Dumper=Dumper, default_flow_style=True).strip()}\n")
+                stream.write("  rows:\n")
+            return stream
+        except Exception as e:
+            _logger.error(
+                "Failed to open YAML stream %s: %s", file_path, e)
+            raise
+
+    @staticmethod
+    def _yaml_quote(value) -> str:
+        """Single-quote a string for use inside a YAML flow sequence"""
+        return "'" + str(value).replace("'", "''") + "'"
+
+    def append_xmlid_rows(self, stream, rows):
+        """Fast path for ir.model.data rows
+
+        Each (module, name, model, res_id, noupdate) row is formatted as
+        one flow-sequence line by hand, skipping PyYAML's per-scalar
+        representer dispatch; the standard loader reads the result back
+        like any other columns/rows table.
+        """
+        quote = self._yaml_quote
+        stream.write(''.join(
+            f"  - [{quote(module)}, {quote(name)}, {quote(model)}, "
+            f"{res_id if res_id is not None else 'null'}, "
+            f"{'true' if noupdate else 'false'}]\n"
+            for module, name, model, res_id, noupdate in rows))
+
     def read_yaml(self, file_path: str) -> dict:
-        """Read data from YAML file"""
+        """Read data from a config file
+
+        Tries the active format's file first and falls back to the
+        canonical .yml path, so a yaml importer can still consume a
+        directory exported in another format and vice versa.
+        """
         try:
-            with open(file_path, 'r') as f:
-                data = yaml.safe_load(f)
-                if data is None:
-                    return {}
-                return data
+            fmt_path = self.format_path(file_path)
+            if fmt_path != file_path and os.path.exists(fmt_path):
+                file_path = fmt_path
+            st = os.stat(file_path)
+            data = _load_cached(file_path, st.st_mtime_ns, st.st_size)
+            if data is None:
+                return {}
+            # Deep copy so callers can't mutate the cached parse
+            return copy.deepcopy(data)
         except FileNotFoundError:
-            _logger.warning(f"YAML file not found: {file_path}")
+            _logger.warning("YAML file not found: %s", file_path)
             return {}
         except Exception as e:
-            _logger.error(f"Failed to read YAML file {file_path}: {str(e)}")
+            _logger.error("Failed to read YAML file %s: %s", file_path, e)
             raise
 
     def export_ir_model_data(self, target_path: str):
         """Export ir.model.data records as YAML"""
         try:
-            ir_data = self.env['ir.model.data'].search([])
+            # Chunked search_read returns plain dicts straight from SQL,
+            # so no browse records pile up in the ORM cache and peak
+            # memory stays O(chunk_size)
+            columns = ['module', 'name', 'model', 'res_id', 'noupdate']
+            ir_model_data = self.env['ir.model.data'].with_context(
+                prefetch_fields=False)
+            file_path = f'{target_path}/ir_model_data.yml'
+            stream = self.open_yaml_stream(
+                file_path, 'ir_model_data', columns=columns)
 
-            data = []
-            for record in ir_data:
-                data.append({
-                    'module': record.module,
-                    'name': record.name,
-                    'model': record.model,
-                    'res_id': record.res_id,
-                    'noupdate': record.noupdate
-                })
+            # When msgpack is installed, also write a sibling file that
+            # imports on the other side can parse far faster than YAML;
+            # the columns list is packed first, then one object per
+            # row chunk so packing stays streamed
+            pack_stream = packer = None
+            if msgpack is not None:
+                pack_stream = open(f'{file_path}.msgpack', 'wb')
+                packer = msgpack.Packer(use_bin_type=True)
+                pack_stream.write(packer.pack(columns))
 
-            self.write_yaml(f'{target_path}/ir_model_data.yml', {
-                'ir_model_data': data
-            })
+            exported = 0
+            offset = 0
+            try:
+                while True:
+                    rows = ir_model_data.search_read(
+                        [], columns,
+                        limit=self.EXPORT_CHUNK_SIZE, offset=offset,
+                        order='id')
+                    if not rows:
+                        break
+                    chunk = [
+                        [row[column] for column in columns] for row in rows
+                    ]
+                    self.append_xmlid_rows(stream, chunk)
+                    if pack_stream is not None:
+                        pack_stream.write(packer.pack(chunk))
+                    exported += len(rows)
+                    if len(rows) < self.EXPORT_CHUNK_SIZE:
+                        break
+                    offset += self.EXPORT_CHUNK_SIZE
+            finally:
+                stream.close()
+                if pack_stream is not None:
+                    pack_stream.close()
 
-            _logger.info(f"Exported {len(data)} ir.model.data records")
-            return len(data)
+            _logger.info("Exported %s ir.model.data records", exported)
+            return exported
 
         except Exception as e:
-            _logger.error(f"Failed to export ir.model.data: {str(e)}")
+            _logger.error("Failed to export ir.model.data: %s", e)
             raise
 
+    def _read_msgpack_table(self, file_path: str) -> list:
+        """Read a streamed msgpack table (columns, then row chunks)"""
+        with open(file_path, 'rb') as f:
+            unpacker = msgpack.Unpacker(f, raw=False)
+            columns = next(unpacker)
+            return [
+                dict(zip(columns, row))
+                for chunk in unpacker
+                for row in chunk
+            ]
+
     def import_ir_model_data(self, source_path: str):
         """Import ir.model.data from YAML"""
         try:
-            data = self.read_yaml(f'{source_path}/ir_model_data.yml')
-            imported_count = 0
-
-            for record_data in data.get('ir_model_data', []):
-                existing = self.env['ir.model.data'].search([
-                    ('module', '=', record_data['module']),
-                    ('name', '=', record_data['name'])
-                ])
-
-                if existing:
-                    existing.write(record_data)
+            # Prefer the msgpack sibling when both it and the library
+            # are available; it parses far faster than YAML
+            msgpack_path = f'{source_path}/ir_model_data.yml.msgpack'
+            if msgpack is not None and os.path.exists(msgpack_path):
+                records = self._read_msgpack_table(msgpack_path)
+            else:
+                data = self.read_yaml(f'{source_path}/ir_model_data.yml')
+                payload = data.get('ir_model_data', [])
+                # Columnar exports carry one columns list plus row
+                # sequences; older list-of-dicts files pass unchanged
+                if isinstance(payload, dict) and 'columns' in payload:
+                    records = [
+                        dict(zip(payload['columns'], row))
+                        for row in payload.get('rows') or []
+                    ]
                 else:
-                    self.env['ir.model.data'].create(record_data)
+                    records = payload or []
+            if not records:
+                return 0
+
+            rows = [
+                (record_data['module'], record_data['name'],
+                 record_data['model'], record_data['res_id'],
+                 record_data['noupdate'])
+                for record_data in records
+            ]
 
-                imported_count += 1
+            # Batched upserts instead of a search plus create/write pair
+            # per record; execute_values folds each page into a single
+            # multi-row VALUES statement, and the savepoint rolls a bad
+            # chunk back cleanly. Committing and dropping the ORM cache
+            # between chunks keeps the resident working set flat on
+            # 100k+ row imports, with an explicit gc pass every
+            # GC_ROW_INTERVAL rows to fold the freed chunks back in
+            since_gc = 0
+            for offset in range(0, len(rows), self.UPSERT_CHUNK_SIZE):
+                chunk = rows[offset:offset + self.UPSERT_CHUNK_SIZE]
+                with self.env.cr.savepoint():
+                    execute_values(
+                        self.env.cr._obj,
+                        "INSERT INTO ir_model_data "
+                        "(module, name, model, res_id, noupdate, "
+                        "create_date, write_date) "
+                        "VALUES %s "
+                        "ON CONFLICT (module, name) DO UPDATE SET "
+                        "model = EXCLUDED.model, res_id = EXCLUDED.res_id, "
+                        "noupdate = EXCLUDED.noupdate, write_date = now()",
+                        chunk,
+                        template="(%s, %s, %s, %s, %s, now(), now())",
+                        page_size=1000)
+                # The rows bypassed the ORM, so drop its cached view of
+                # them before releasing the chunk's transaction
+                self.env['ir.model.data'].invalidate_model()
+                self.env.cr.commit()
+                since_gc += len(chunk)
+                if since_gc >= self.GC_ROW_INTERVAL:
+                    gc.collect()
+                    since_gc = 0
 
-            _logger.info(f"Imported {imported_count} ir.model.data records")
-            return imported_count
+            _logger.info("Imported %s ir.model.data records", len(rows))
+            return len(rows)
 
         except Exception as e:
-            _logger.error(f"Failed to import ir.model.data: {str(e)}")
+            _logger.error("Failed to import ir.model.data: %s", e)
             raise
@@ -4,6 +4,9 @@ Standalone CLI script for Odoo Configuration Management
 Usage: python odoo_config_cli.py --help
 """
 
+import concurrent.futures
+import contextlib
+import functools
 import os
 import sys
 import click
@@ -14,6 +17,60 @@ module_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, module_path)
 
 
+@functools.lru_cache(maxsize=4)
+def _bootstrap_odoo(database, odoo_path=None):
+    """Import and configure Odoo once per (database, odoo_path)
+
+    Returns (registry, api, SUPERUSER_ID, create_config_factory). The
+    cache lets repeated commands in one process reuse the already
+    parsed config and loaded modules instead of re-running the costly
+    odoo import and parse_config per invocation.
+    """
+    if odoo_path:
+        sys.path.insert(0, odoo_path)
+
+    import odoo
+    from odoo import registry, api, SUPERUSER_ID
+
+    # Initialize Odoo, skipping parse_config when already configured
+    if odoo.tools.config['db_name'] != database:
+        odoo.tools.config.parse_config(['-d', database])
+
+    from models.config_factory import create_config_factory
+
+    return registry, api, SUPERUSER_ID, create_config_factory
+
+
+@contextlib.contextmanager
+def odoo_env(database, odoo_path=None):
+    """Open an Odoo environment plus config factory for one command
+
+    Shares the cached bootstrap across commands and gives every caller
+    the same cursor lifecycle instead of repeating the block per
+    subcommand.
+    """
+    registry, api, SUPERUSER_ID, create_config_factory = \
+        _bootstrap_odoo(database, odoo_path)
+
+    with registry(database).cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        yield env, create_config_factory(env)
+
+
+def _export_one_type(database, odoo_path, output, fmt, config_type):
+    """Worker: export a single config type with its own cursor"""
+    _bootstrap_odoo(database, odoo_path)
+
+    # A forked worker inherits the parent's connection pool; close any
+    # inherited connections so two processes never multiplex one socket
+    import odoo
+    odoo.sql_db.close_all()
+
+    with odoo_env(database, odoo_path) as (env, factory):
+        return config_type, factory.export_config_type(
+            config_type, output, fmt)
+
+
 @click.group()
 @click.option('--log-level', default='INFO', help='Log level (DEBUG, INFO, WARNING, ERROR)')
 def cli(log_level):
@@ -28,40 +85,42 @@ def cli(log_level):
 @click.option('--database', '-d', required=True, help='Database name')
 @click.option('--output', '-o', required=True, help='Output directory path')
 @click.option('--odoo-path', help='Path to Odoo installation (if not in PYTHONPATH)')
-def export(database, output, odoo_path):
+@click.option('--jobs', '-j', type=int, default=None,
+              help='Parallel export workers (default: one per config type)')
+@click.option('--format', 'fmt', type=click.Choice(['yaml', 'json', 'msgpack']),
+              default='yaml',
+              help='Serialization format (yaml is the human-editable default)')
+def export(database, output, odoo_path, jobs, fmt):
     """Export system configurations to YAML files"""
-    
+
     try:
-        # Set up Odoo environment
-        if odoo_path:
-            sys.path.insert(0, odoo_path)
-        
-        import odoo
-        from odoo import registry, api, SUPERUSER_ID
-        
-        # Initialize Odoo
-        odoo.tools.config.parse_config(['-d', database])
-        
         # Ensure output directory exists
         os.makedirs(output, exist_ok=True)
-        
-        with registry(database).cursor() as cr:
-            env = api.Environment(cr, SUPERUSER_ID, {})
-            
-            # Import our module classes
-            from models.config_factory import create_config_factory
-            
-            factory = create_config_factory(env)
-            result = factory.export_all(output)
-            
-            if result['success']:
-                click.echo(f"✓ Exported {result['exported_configs']} config types")
-                click.echo(f"✓ Total records: {result['total_records']}")
-                click.echo(f"✓ Output: {result['output_path']}")
-            else:
-                click.echo(f"✗ Export failed: {result.get('error')}")
-                sys.exit(1)
-                
+
+        # The exportable types are a class constant; resolving them
+        # needs no env, so the parent opens no database connection
+        # before the workers fork
+        _bootstrap_odoo(database, odoo_path)
+        from models.config_exporter import MinimalConfigExporter
+        config_types = list(MinimalConfigExporter.EXPORT_CONFIG_TYPES)
+
+        # Config types touch disjoint tables, so each exports from its
+        # own worker process with its own cursor
+        workers = min(jobs or len(config_types), os.cpu_count() or 1)
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers) as pool:
+            counts = dict(pool.map(
+                functools.partial(
+                    _export_one_type, database, odoo_path, output, fmt),
+                config_types))
+
+        with odoo_env(database, odoo_path) as (env, factory):
+            manifest = factory.write_manifest(output, counts, fmt)
+
+        click.echo(f"✓ Exported {len(counts)} config types")
+        click.echo(f"✓ Total records: {manifest['total_records']}")
+        click.echo(f"✓ Output: {output}")
+
     except Exception as e:
         click.echo(f"✗ Export failed: {str(e)}")
         logging.exception("Export command failed")
@@ -73,32 +132,19 @@ def export(database, output, odoo_path):
 @click.option('--source', '-s', required=True, help='Source directory path')
 @click.option('--dry-run', is_flag=True, help='Validate only, do not import')
 @click.option('--odoo-path', help='Path to Odoo installation (if not in PYTHONPATH)')
-def import_configs(database, source, dry_run, odoo_path):
+@click.option('--format', 'fmt', type=click.Choice(['yaml', 'json', 'msgpack']),
+              default='yaml',
+              help='Serialization format of the source directory')
+def import_configs(database, source, dry_run, odoo_path, fmt):
     """Import system configurations from YAML files"""
     
     try:
-        # Set up Odoo environment
-        if odoo_path:
-            sys.path.insert(0, odoo_path)
-        
-        import odoo
-        from odoo import registry, api, SUPERUSER_ID
-        
-        # Initialize Odoo
-        odoo.tools.config.parse_config(['-d', database])
-        
-        with registry(database).cursor() as cr:
-            env = api.Environment(cr, SUPERUSER_ID, {})
-            
-            # Import our module classes
-            from models.config_factory import create_config_factory
-            
-            factory = create_config_factory(env)
-            
+        with odoo_env(database, odoo_path) as (env, factory):
             if dry_run:
                 click.echo("Validating configurations (dry run)...")
                 
-                validation_result = factory.validate_import_path(source)
+                validation_result = factory.validate_import_path(
+                    source, fmt)
                 
                 if validation_result['valid']:
                     click.echo("✓ All required configuration files found")
@@ -109,7 +155,7 @@ def import_configs(database, source, dry_run, odoo_path):
                     sys.exit(1)
             else:
                 click.echo("Importing configurations...")
-                result = factory.import_all(source)
+                result = factory.import_all(source, fmt=fmt)
                 
                 if result['success']:
                     click.echo(f"✓ Successfully imported {result['imported_config_types']} config types")
@@ -129,28 +175,15 @@ def import_configs(database, source, dry_run, odoo_path):
 @click.option('--database', '-d', required=True, help='Database name')
 @click.option('--source', '-s', required=True, help='Source directory path')
 @click.option('--odoo-path', help='Path to Odoo installation (if not in PYTHONPATH)')
-def validate(database, source, odoo_path):
+@click.option('--format', 'fmt', type=click.Choice(['yaml', 'json', 'msgpack']),
+              default='yaml',
+              help='Serialization format of the source directory')
+def validate(database, source, odoo_path, fmt):
     """Validate configuration files without importing"""
     
     try:
-        # Set up Odoo environment
-        if odoo_path:
-            sys.path.insert(0, odoo_path)
-        
-        import odoo
-        from odoo import registry, api, SUPERUSER_ID
-        
-        # Initialize Odoo
-        odoo.tools.config.parse_config(['-d', database])
-        
-        with registry(database).cursor() as cr:
-            env = api.Environment(cr, SUPERUSER_ID, {})
-            
-            # Import our module classes
-            from models.config_factory import create_config_factory
-            
-            factory = create_config_factory(env)
-            validation_result = factory.validate_import_path(source)
+        with odoo_env(database, odoo_path) as (env, factory):
+            validation_result = factory.validate_import_path(source, fmt)
             
             if validation_result['valid']:
                 click.echo(f"✓ {validation_result['message']}")